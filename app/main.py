@@ -1,13 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import csv
 import json
+import orjson
 import os
 import ast
 import sys
+import functools
+import secrets
+import pandas as pd
 from typing import AsyncGenerator
 
 # Add project root to python path so we can import 'app' module when running directly
@@ -23,7 +26,8 @@ from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 
 # Import our tools
-from app.tools import TOOLS
+from app import tools
+from app.tools import TOOLS, list_columns
 
 load_dotenv()
 
@@ -40,6 +44,7 @@ app.add_middleware(
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+RELOAD_TOKEN = os.getenv("RELOAD_TOKEN")
 
 if not GOOGLE_API_KEY:
     print("GOOGLE_API_KEY not found in environment variables!")
@@ -61,6 +66,7 @@ COLUMN DATA TYPES:
 - LIST columns (contain Python lists): hazard_type, hazard_severity, hazard_notes, life_species, life_avg_depth_m, life_density, life_threat_level, life_behavior, life_trophic_level, life_prey_species, poi_id, poi_category, poi_label, poi_description, poi_research_value, resource_type, resource_family, resource_abundance, resource_purity, resource_extraction_difficulty, resource_environmental_impact, resource_economic_value, resource_description, biome_predators, biome_prey, biome_interaction_strengths
 - NUMERIC columns (floats/ints): row, col, x_km, y_km, lat, lon, depth_m, pressure_atm, temperature_c, light_intensity, terrain_roughness, coral_coral_cover_pct, coral_health_index, coral_bleaching_risk, coral_biodiversity_index, current_u_mps, current_v_mps, current_speed_mps
 - STRING columns: biome, current_stability (values: "low", "medium", "high")
+- DERIVED columns (precomputed from the list columns): <list column>_len (item count) for every list column, plus <list column>_sum and <list column>_max for numeric list columns, e.g. resource_economic_value_sum, life_density_max, hazard_type_len
 
 DETAILED COLUMN DESCRIPTIONS:
 - row, col: Grid coordinates (0-49)
@@ -141,7 +147,8 @@ IMPORTANT NOTES:
 - Use pandas operations to filter, sort, and analyze the data
 - When user asks to "find" or "show" tiles, use query_and_highlight (it auto-highlights)
 - When user asks "how many" or wants statistics, use query_data (no highlighting)
-- Economic value is stored in resource_economic_value as a list of values
+- Economic value is stored in resource_economic_value as a list of values; its per-tile total is resource_economic_value_sum
+- Prefer the DERIVED _sum/_max/_len columns over .apply() on list columns for ranking and filtering (e.g. df.nlargest(5, 'resource_economic_value_sum'))
 - IF you are asked to search for something, and you are returned a empty result, then YOU MUST make a query_data  tool call to get all the unique values for a column to find the correct key. CAUTION: Do not do this for the columns that do not contain string or list values. After this, return your response to the user."""
 
     agent = create_agent(
@@ -161,70 +168,83 @@ class ChatRequest(BaseModel):
 
 # --- ENDPOINTS ---
 
-def safe_eval(val):
-    if not val:
-        return []
-    try:
-        val = val.strip()
-        if val.startswith('[') and val.endswith(']'):
-            return ast.literal_eval(val)
-        return val
-    except (ValueError, SyntaxError):
-        return []
+def _full_data_rows(df):
+    """Converts the dataframe into one list of values per cell, with None for empty values."""
+    # Work out which cells are empty column-wise instead of per cell in Python
+    keep = df.notna()
+    for col in list_columns:
+        if col in df.columns:
+            keep[col] = df[col].map(len) > 0
+    
+    # tolist() yields plain Python values (lists, floats, str) for both
+    # NumPy- and Arrow-backed columns, so orjson can encode them directly
+    values = pd.DataFrame({col: pd.Series(df[col].tolist(), index=df.index, dtype=object) for col in df.columns})
+    return values.where(keep, None).to_numpy().tolist()
 
 @app.get("/")
 async def read_index():
     return FileResponse('app/static/index.html')
 
-@app.get("/api/grid")
-async def get_grid():
-    optimizer = AbyssalOptimizer()
+# Scoring data is loaded once per process, not once per request
+optimizer = AbyssalOptimizer()
+optimizer.load_data()
+
+DEFAULT_WEIGHTS = {
+    'value': 1.0,
+    'difficulty': 1.0,
+    'impact': 2.0,
+    'hazard': 2.0
+}
+
+# Field order of each entry in the /api/grid 'rows' list
+GRID_SCHEMA = [
+    'row', 'col', 'lat', 'lon', 'depth', 'biome', 'pressure', 'temp',
+    'score', 'total_value', 'difficulty', 'env_impact', 'hazard_score',
+    'hazards', 'resources', 'life', 'life_iucn'
+]
+
+@functools.lru_cache(maxsize=1)
+def _load_grid():
+    """Builds the scored grid once; merged.csv is static between deploys."""
+    scored_data = optimizer.calculate_scores(DEFAULT_WEIGHTS)
     
-    # Load data
-    if not optimizer.load_data():
-        return {"error": "merged.csv not found"}
-        
-    # Calculate scores with default weights
-    weights = {
-        'value': 1.0,
-        'difficulty': 1.0,
-        'impact': 2.0,
-        'hazard': 2.0
-    }
-    
-    scored_data = optimizer.calculate_scores(weights)
+    # Build full_data from the already-typed tools dataframe
+    df, source_columns = tools.DF, tools.SOURCE_COLUMNS
+    keys = zip(df['row'].astype(int).tolist(), df['col'].astype(int).tolist())
+    full_data_map = dict(zip(keys, _full_data_rows(df[source_columns])))  # Map (row, col) -> full_data values
+    missing = [None] * len(source_columns)
     
-    # Now load full CSV data to add full_data field
-    filepath = 'merged.csv'
-    full_data_map = {}  # Map (row, col) -> full_data dict
-    
-    if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                full_data = {}
-                for k, v in row.items():
-                    if v and v.strip():
-                        if v.strip().startswith('[') and v.strip().endswith(']'):
-                            full_data[k] = safe_eval(v)
-                        else:
-                            try:
-                                if '.' in v:
-                                    full_data[k] = float(v)
-                                else:
-                                    full_data[k] = int(v)
-                            except ValueError:
-                                full_data[k] = v
-                
-                key = (int(row['row']), int(row['col']))
-                full_data_map[key] = full_data
-    
-    # Merge full_data into scored_data
-    for item in scored_data:
-        key = (item['row'], item['col'])
-        item['full_data'] = full_data_map.get(key, {})
-    
-    return scored_data
+    # Send each cell as a positional row against a shared key list, so key
+    # names are not repeated for every cell in the payload
+    return {
+        'schema': GRID_SCHEMA,
+        'full_data_schema': source_columns,
+        'rows': [[item[k] for k in GRID_SCHEMA] for item in scored_data],
+        'full_data': [full_data_map.get((item['row'], item['col']), missing) for item in scored_data],
+    }
+
+@functools.lru_cache(maxsize=1)
+def _grid_payload():
+    """Serializes the cached grid once with orjson so requests just send bytes."""
+    return orjson.dumps(_load_grid(), option=orjson.OPT_SERIALIZE_NUMPY)
+
+@app.get("/api/grid")
+async def get_grid():
+    return Response(content=_grid_payload(), media_type="application/json")
+
+@app.post("/api/reload")
+async def reload_grid(x_reload_token: str = Header(default="")):
+    """Admin endpoint: re-reads the merged data for the scores, full_data and the agent tools.
+
+    Requires the RELOAD_TOKEN env var to be set and sent in the X-Reload-Token header.
+    """
+    if not RELOAD_TOKEN or not secrets.compare_digest(x_reload_token.encode(), RELOAD_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Reload not permitted")
+    optimizer.load_data()
+    tools.reload_data()
+    _load_grid.cache_clear()
+    _grid_payload.cache_clear()
+    return {"status": "ok"}
 
 async def generate_response(user_message: str) -> AsyncGenerator[str, None]:
     global agent, thread_id
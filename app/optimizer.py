@@ -2,6 +2,7 @@ import csv
 import ast
 import json
 import os
+import orjson
 
 class AbyssalOptimizer:
     def __init__(self, filepath='merged.csv'):
@@ -37,9 +38,15 @@ class AbyssalOptimizer:
         if not val:
             return []
         try:
-            if val.startswith('[') and val.endswith(']'):
-                return ast.literal_eval(val)
+            return orjson.loads(val)
+        except orjson.JSONDecodeError:
+            pass
+        # Older merged.csv files store lists in Python repr syntax
+        s = val.strip()
+        if s[:1] != '[' or s[-1:] != ']':
             return val
+        try:
+            return ast.literal_eval(s)
         except (ValueError, SyntaxError):
             return []
 
@@ -51,12 +51,13 @@ document.addEventListener('DOMContentLoaded', () => {
             console.log('API response status:', response.status);
             return response.json();
         })
-        .then(data => {
-            console.log('Data received, length:', data.length);
-            if (data.error) {
-                console.error('API error:', data.error);
+        .then(payload => {
+            if (payload.error) {
+                console.error('API error:', payload.error);
                 return;
             }
+            const data = unpackGrid(payload);
+            console.log('Data received, length:', data.length);
             // Calculate max score for normalization
             maxScore = Math.max(...data.map(d => d.score || 0));
             if (maxScore <= 0) maxScore = 1; // Avoid div by zero
@@ -85,6 +86,25 @@ document.addEventListener('DOMContentLoaded', () => {
             alert('Failed to load map data. Check console for details.');
         });
 
+    // The grid is sent as positional rows plus shared key lists; rebuild the objects
+    function unpackGrid(payload) {
+        return payload.rows.map((values, i) => {
+            const d = {};
+            payload.schema.forEach((key, j) => {
+                d[key] = values[j];
+            });
+
+            // Empty values are sent as null and left out of full_data
+            const fullData = {};
+            const fullValues = payload.full_data[i];
+            payload.full_data_schema.forEach((key, j) => {
+                if (fullValues[j] !== null) fullData[key] = fullValues[j];
+            });
+            d.full_data = fullData;
+            return d;
+        });
+    }
+
     function initDeckGL(processedData) {
         deckglInstance = new DeckGL({
             container: 'map-container',
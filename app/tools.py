@@ -1,14 +1,26 @@
+import math
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 import ast
+import functools
+import os
+import orjson
 from langchain.tools import tool
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
 
-# Load data once for the tools
-DF = pd.read_csv('merged.csv')
+CSV_PATH = 'merged.csv'
+PARQUET_PATH = 'merged.parquet'
+FEATHER_PATH = 'merged.feather'
 
 # Parse list columns from strings to actual lists
-# These columns contain stringified lists like "[item1, item2]"
+# These columns hold JSON lists like '["item1", "item2"]' (current merger output)
+# or Python-repr lists like "['item1', 'item2']" (older merged.csv); both are parsed
 list_columns = [
     'hazard_type', 'hazard_severity', 'hazard_notes',
     'life_species', 'life_avg_depth_m', 'life_density', 'life_threat_level', 
@@ -26,20 +38,194 @@ list_columns = [
 
 def safe_parse_list(val):
     """Safely parse a string representation of a list into an actual list."""
-    if pd.isna(val) or val == '':
+    if not isinstance(val, str) or val == '':
         return []
-    if isinstance(val, str):
+    try:
+        parsed = orjson.loads(val)
+    except orjson.JSONDecodeError:
+        # Older merged.csv files store lists in Python repr syntax
+        s = val.strip()
+        if s[:1] != '[' or s[-1:] != ']':
+            return []
         try:
-            if val.startswith('[') and val.endswith(']'):
-                return ast.literal_eval(val)
+            parsed = ast.literal_eval(s)
         except (ValueError, SyntaxError):
-            pass
-    return []
+            return []
+    return parsed if isinstance(parsed, list) else []
+
+def parse_list_column(series):
+    """Parses a whole column of JSON list cells with a single orjson call."""
+    cells = series.fillna('[]').astype(str)
+    cells = cells.where(cells != '', '[]')
+    try:
+        parsed = orjson.loads('[' + ','.join(cells) + ']')
+    except orjson.JSONDecodeError:
+        parsed = None
+    
+    # Fall back to per-cell parsing if any cell is not a JSON list
+    # (e.g. an older merged.csv written in Python repr syntax)
+    if parsed is None or len(parsed) != len(series) or not all(isinstance(v, list) for v in parsed):
+        return series.apply(safe_parse_list)
+    return pd.Series(parsed, index=series.index, dtype=object)
+
+def fill_empty_lists(table):
+    """Replaces null cells in the list columns of an Arrow table with empty lists."""
+    for i, field in enumerate(table.schema):
+        column = table.column(i)
+        if pa.types.is_list(field.type) and column.null_count:
+            table = table.set_column(i, field, pc.fill_null(column, pa.scalar([], type=field.type)))
+    return table
+
+def decode_dictionaries(table):
+    """Turns dictionary-encoded (categorical on disk) columns back into plain values."""
+    # Categoricals would add zero-count categories to value_counts() and
+    # empty groups to groupby() in agent code
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            decoded = table.column(i).cast(field.type.value_type)
+            table = table.set_column(i, pa.field(field.name, decoded.type), decoded)
+    return table
+
+def decode_list_dictionaries(table):
+    """Expands dictionary-encoded list items (as written by the merger) back to plain values."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_list(field.type) and pa.types.is_dictionary(field.type.value_type):
+            column = table.column(i).combine_chunks()
+            decoded = pa.ListArray.from_arrays(column.offsets, column.flatten().dictionary_decode())
+            table = table.set_column(i, pa.field(field.name, decoded.type), decoded)
+    return table
+
+def is_fresh(path):
+    """True if a binary copy exists and is not older than merged.csv."""
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(CSV_PATH) or os.path.getmtime(path) >= os.path.getmtime(CSV_PATH)
+
+def load_dataframe():
+    """Loads the merged dataset, preferring the pre-parsed binary copies over the CSV.
+
+    Returns (df, list_arrays): list_arrays maps list columns to the Arrow arrays
+    they were read from (empty on the CSV path), so aggregates can reuse them.
+    """
+    if is_fresh(FEATHER_PATH):
+        # Arrow IPC: no decompression and no string parsing
+        table = feather.read_table(FEATHER_PATH)
+    elif is_fresh(PARQUET_PATH):
+        # Parquet keeps list columns typed, so there is no string parsing to do
+        table = pq.read_table(PARQUET_PATH)
+    else:
+        df = pd.read_csv(CSV_PATH, engine='pyarrow')
+
+        # Parse all list columns, one column per worker; results are assigned
+        # after the pool finishes so df isn't modified while being read
+        cols = [col for col in list_columns if col in df.columns]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            parsed = list(executor.map(lambda col: parse_list_column(df[col]), cols))
+        for col, series in zip(cols, parsed):
+            df[col] = series
+        return df, {}
+
+    # Default conversion gives the same NumPy-backed dtypes (NaN, not pd.NA) as
+    # the CSV path, so agent comparisons on nullable columns behave the same
+    table = decode_dictionaries(decode_list_dictionaries(fill_empty_lists(table)))
+    df = table.to_pandas()
+    
+    # List cells must be Python lists, exactly as on the CSV path: agent code
+    # relies on list semantics (isinstance(x, list), truthiness of x)
+    list_arrays = {}
+    for i, field in enumerate(table.schema):
+        if pa.types.is_list(field.type):
+            list_arrays[field.name] = table.column(i).combine_chunks()
+            df[field.name] = pd.Series(list_arrays[field.name].to_pylist(), index=df.index, dtype=object)
+    return df, list_arrays
 
-# Parse all list columns
-for col in list_columns:
-    if col in DF.columns:
-        DF[col] = DF[col].apply(safe_parse_list)
+def list_array(series):
+    """Converts a column of Python lists to an Arrow list array, or None if the item types are mixed."""
+    try:
+        arr = pa.array(series.tolist(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    return arr if pa.types.is_list(arr.type) else None
+
+def add_list_aggregates(df, list_arrays=None):
+    """Adds scalar <col>_len columns for list columns, plus <col>_sum and <col>_max for numeric ones."""
+    list_arrays = list_arrays or {}
+    n_rows = len(df)
+    derived = {}
+    for col in list_columns:
+        if col not in df.columns:
+            continue
+        arr = list_arrays[col] if col in list_arrays else list_array(df[col])
+        if arr is None:
+            derived[f'{col}_len'] = df[col].map(len).to_numpy()
+            continue
+        derived[f'{col}_len'] = pc.fill_null(pc.list_value_length(arr), 0).to_numpy()
+        
+        # Numeric-ness comes from the Arrow item type, not from coercion
+        value_type = arr.type.value_type
+        if not (pa.types.is_integer(value_type) or pa.types.is_floating(value_type)):
+            continue
+        
+        # One pass over the flattened items, scattered back to their parent row
+        values = pc.list_flatten(arr).to_numpy(zero_copy_only=False).astype(np.float64)
+        parents = pc.list_parent_indices(arr).to_numpy()
+        present = ~np.isnan(values)
+        sums = np.bincount(parents[present], weights=values[present], minlength=n_rows)
+        maxes = np.full(n_rows, np.nan)
+        np.fmax.at(maxes, parents, values)
+        
+        derived[f'{col}_sum'] = sums.astype(np.int64) if pa.types.is_integer(value_type) else sums
+        derived[f'{col}_max'] = maxes
+    
+    # Add all derived columns in one concat rather than one insert each
+    return pd.concat([df, pd.DataFrame(derived, index=df.index)], axis=1)
+
+def build_data():
+    """Loads the dataset and adds the derived columns; returns (df, source columns)."""
+    df, list_arrays = load_dataframe()
+    # Columns as stored in merged.csv, before the derived aggregates
+    source_columns = list(df.columns)
+    return add_list_aggregates(df, list_arrays), source_columns
+
+# Agents often resend the same snippet, so keep the compiled bytecode around
+_compile = functools.lru_cache(maxsize=256)(compile)
+
+# Hot scalar columns as plain, read-only NumPy arrays (same row order as DF),
+# so simple masks run on contiguous buffers instead of through pandas
+_ARRAY_COLUMNS = {
+    'row_arr': ('row', np.int64),
+    'col_arr': ('col', np.int64),
+    'lat': ('lat', np.float64),
+    'lon': ('lon', np.float64),
+    'depth': ('depth_m', np.float64),
+}
+
+def column_arrays(df):
+    """Builds the read-only NumPy arrays exposed to agent code."""
+    arrays = {}
+    for name, (col, dtype) in _ARRAY_COLUMNS.items():
+        arr = df[col].to_numpy(dtype=dtype)
+        arr.setflags(write=False)
+        arrays[name] = arr
+    return arrays
+
+# Shared globals for agent code: the usual modules are bound up front so
+# snippets can use them without importing
+_EXEC_GLOBALS = {
+    'pd': pd,
+    'np': np,
+    'math': math,
+}
+
+# Load data once for the tools
+DF, SOURCE_COLUMNS = build_data()
+_EXEC_GLOBALS.update(column_arrays(DF))
+
+def reload_data():
+    """Re-reads the merged dataset and rebuilds DF and everything derived from it."""
+    global DF, SOURCE_COLUMNS
+    DF, SOURCE_COLUMNS = build_data()
+    _EXEC_GLOBALS.update(column_arrays(DF))
 
 class HighlightTilesInput(BaseModel):
     tiles: List[Dict[str, Any]] = Field(..., description="List of row/col dictionaries, optionally with color e.g. [{'row': 1, 'col': 2, 'color': [255, 0, 0]}, ...]")
@@ -78,6 +264,8 @@ def query_data(code: str):
     Use this tool to get information, statistics, or answers WITHOUT highlighting tiles.
     
     The dataframe 'df' has columns like: 'row', 'col', 'depth_m', 'biome', 'resource_economic_value', etc.
+    'pd', 'np' and 'math' are already available without importing.
+    NumPy arrays 'row_arr', 'col_arr', 'lat', 'lon' and 'depth' (depth_m) hold the same rows as 'df'.
     
     You MUST assign the final result to a variable named 'result'.
     'result' can be a string, number, list, or any data you want to return to the user.
@@ -90,15 +278,14 @@ def query_data(code: str):
     # Find max depth
     result = f"Maximum depth is {df['depth_m'].max()}m"
     
-    # Get statistics
-    df['total_econ'] = df['resource_economic_value'].apply(lambda x: sum(x) if len(x) > 0 else 0)
-    result = f"Average economic value: {df['total_econ'].mean():.2f}"
+    # Get statistics (prefer the precomputed _sum/_max/_len columns over apply on list columns)
+    result = f"Average economic value: {df['resource_economic_value_sum'].mean():.2f}"
     """
-    local_vars = {'df': DF, 'pd': pd}
+    local_vars = {'df': DF}
     print(f"[query_data] Executing:\n{code}")
     
     try:
-        exec(code, {}, local_vars)
+        exec(_compile(code, '<agent>', 'exec'), _EXEC_GLOBALS, local_vars)
         if 'result' not in local_vars:
             return "ERROR: Code did not assign 'result' variable."
         
@@ -114,6 +301,8 @@ def query_and_highlight(code: str):
     Use this tool when you want to find AND highlight specific tiles on the map.
     
     The dataframe 'df' has columns like: 'row', 'col', 'depth_m', 'biome', 'resource_economic_value', etc.
+    'pd', 'np' and 'math' are already available without importing.
+    NumPy arrays 'row_arr', 'col_arr', 'lat', 'lon' and 'depth' (depth_m) hold the same rows as 'df'.
     
     You MUST assign the final result to a variable named 'result_rows'.
     'result_rows' MUST be a list of dictionaries with BOTH 'row' AND 'col' keys.
@@ -124,19 +313,22 @@ def query_and_highlight(code: str):
     
     Example code:
     # Find top 5 richest tiles
-    df['total_econ'] = df['resource_economic_value'].apply(lambda x: sum(x) if len(x) > 0 else 0)
-    top_5 = df.nlargest(5, 'total_econ')
+    top_5 = df.nlargest(5, 'resource_economic_value_sum')
     result_rows = top_5[['row', 'col']].to_dict('records')
     
     # Find all tiles deeper than 3000m
     deep_tiles = df[df['depth_m'] > 3000]
     result_rows = deep_tiles[['row', 'col']].to_dict('records')
+    
+    # Same query on the NumPy arrays (fastest for simple numeric filters)
+    mask = depth > 3000
+    result_rows = [{'row': int(r), 'col': int(c)} for r, c in zip(row_arr[mask], col_arr[mask])]
     """
-    local_vars = {'df': DF, 'pd': pd}
+    local_vars = {'df': DF}
     print(f"[query_and_highlight] Executing:\n{code}")
     
     try:
-        exec(code, {}, local_vars)
+        exec(_compile(code, '<agent>', 'exec'), _EXEC_GLOBALS, local_vars)
         
         if 'result_rows' not in local_vars:
             return "ERROR: Code did not assign 'result_rows' variable."
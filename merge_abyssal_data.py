@@ -1,17 +1,129 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import orjson
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+def aggregate_lists(df, keys, value_cols):
+    """Groups df by keys and collects every value column into per-group lists."""
+    # Sort once (stable, so row order inside a group is kept) and slice each
+    # column at the group boundaries instead of building a list per group per column
+    df = df.dropna(subset=keys).sort_values(keys, kind='stable')
+    starts = np.flatnonzero(~df.duplicated(subset=keys).to_numpy())
+    bounds = np.append(starts, len(df)).tolist()
+
+    df_agg = df.iloc[starts][keys].reset_index(drop=True)
+    for c in value_cols:
+        values = df[c].tolist()
+        df_agg[c] = [values[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+    return df_agg
+
+def categorize_strings(df, max_categories=256):
+    """Converts low-cardinality string columns to the pandas category dtype."""
+    for c in df.columns:
+        if not (df[c].dtype == object or isinstance(df[c].dtype, pd.StringDtype)):
+            continue
+        if df[c].nunique() < max_categories:
+            df[c] = df[c].astype('category')
+    return df
+
+def dictionary_encode_lists(table):
+    """Stores the items of string list columns as integer codes into a per-column vocabulary."""
+    for i, field in enumerate(table.schema):
+        if pa.types.is_list(field.type) and pa.types.is_string(field.type.value_type):
+            column = table.column(i).combine_chunks()
+            encoded = pa.ListArray.from_arrays(column.offsets, pc.dictionary_encode(column.flatten()))
+            table = table.set_column(i, pa.field(field.name, encoded.type), encoded)
+    return table
+
+def is_list_column(series):
+    """True if any cell of the column holds a Python list."""
+    return any(isinstance(v, list) for v in series)
+
+def write_arrow_copies(df_cells, parquet_path, feather_path):
+    """Writes the Parquet and Feather copies of the merged data used by the app."""
+    # List columns are stored as native Arrow lists, so loading these copies
+    # skips the per-cell string parsing the CSV needs
+    df_arrow = df_cells.copy()
+    for col in df_arrow.columns:
+        if is_list_column(df_arrow[col]):
+            # Cells without entries become empty lists rather than nulls
+            df_arrow[col] = [v if isinstance(v, list) else [] for v in df_arrow[col]]
+
+    print(f"Saving merged data to {parquet_path}...")
+    df_arrow.to_parquet(parquet_path, engine='pyarrow', compression='zstd', index=False)
+    print(f"Saving merged data to {feather_path}...")
+    # Species names, labels etc. repeat across many cells: write them once per column
+    table = dictionary_encode_lists(pa.Table.from_pandas(df_arrow, preserve_index=False))
+    feather.write_feather(table, feather_path)
+
+def load_aux_csv(filepath, filename, prefix):
+    """Reads one auxiliary CSV, prefixes its columns and aggregates it to one row per cell.
+
+    Runs on a worker thread, so progress messages are returned alongside the
+    frame and printed by the caller instead of interleaving.
+    """
+    messages = [f"Processing {filename}..."]
+    df_other = pd.read_csv(filepath, engine='pyarrow')
+
+    # Rename columns excluding keys
+    cols_to_rename = {c: f"{prefix}_{c}" for c in df_other.columns if c not in ['row', 'col']}
+    df_other.rename(columns=cols_to_rename, inplace=True)
+    
+    # Special handling for life.csv prey parsing (internal cleanup only)
+    # We want the merged result to be a list of the raw strings
+    if filename == 'life.csv':
+        prey_col = f"{prefix}_prey_species"
+        if prey_col in df_other.columns:
+            # Normalize empty values to empty string
+            df_other[prey_col] = df_other[prey_col].fillna('')
+
+    # Repeated labels (hazard types, severities, behaviors...) become int codes
+    df_other = categorize_strings(df_other)
+
+    # Aggregate duplicates
+    if df_other.duplicated(subset=['row', 'col']).any():
+        messages.append(f"  Found duplicate entries for (row, col) in {filename}. Aggregating...")
+        
+        value_cols = [c for c in df_other.columns if c not in ['row', 'col']]
+        
+        # Group by cell and aggregate into lists
+        # This preserves index alignment:
+        # life_species[0] corresponds to life_prey_species[0]
+        df_agg = aggregate_lists(df_other, ['row', 'col'], value_cols)
+        
+        # Cleanup completely empty prey lists for life.csv
+        if filename == 'life.csv':
+            prey_col = f"{prefix}_prey_species"
+            if prey_col in df_agg.columns:
+                def clean_prey(lst):
+                    # If list contains only empty strings (no prey for any species in cell), return None (BLANK)
+                    if isinstance(lst, list) and all(x == '' for x in lst):
+                        return None
+                    return lst
+                df_agg[prey_col] = df_agg[prey_col].apply(clean_prey)
+
+        df_other = df_agg
+        messages.append(f"  Aggregated shape: {df_other.shape}")
+
+    return df_other.set_index(['row', 'col']), messages
 
 def main():
     base_dir = 'Abyssal_World'
     cells_path = os.path.join(base_dir, 'cells.csv')
     merged_path = 'merged.csv'
+    parquet_path = 'merged.parquet'
+    feather_path = 'merged.feather'
 
     if not os.path.exists(cells_path):
         print(f"Error: {cells_path} not found.")
         return
 
     print(f"Loading base file: {cells_path}")
-    df_cells = pd.read_csv(cells_path)
+    df_cells = categorize_strings(pd.read_csv(cells_path, engine='pyarrow'))
     print(f"Base shape: {df_cells.shape}")
 
     csv_files = {
@@ -23,70 +135,42 @@ def main():
         'resources.csv': 'resource'
     }
 
+    available = []
     for filename, prefix in csv_files.items():
         filepath = os.path.join(base_dir, filename)
         if not os.path.exists(filepath):
             print(f"Skipping {filename} (not found)")
             continue
+        available.append((filepath, filename, prefix))
 
-        print(f"Processing {filename}...")
-        df_other = pd.read_csv(filepath)
+    # Read and aggregate the auxiliary files concurrently, then join them all
+    # onto the base table in a single pass instead of one merge per file
+    with ThreadPoolExecutor() as executor:
+        results = list(executor.map(lambda args: load_aux_csv(*args), available))
 
-        # Rename columns excluding keys
-        cols_to_rename = {c: f"{prefix}_{c}" for c in df_other.columns if c not in ['row', 'col']}
-        df_other.rename(columns=cols_to_rename, inplace=True)
-        
-        # Special handling for life.csv prey parsing (internal cleanup only)
-        # We want the merged result to be a list of the raw strings
-        if filename == 'life.csv':
-            prey_col = f"{prefix}_prey_species"
-            if prey_col in df_other.columns:
-                # Normalize empty values to empty string
-                df_other[prey_col] = df_other[prey_col].fillna('')
+    # Left join on unique (row, col) keys: row count stays, each file adds its columns
+    n_cols = df_cells.shape[1]
+    for df_other, messages in results:
+        for message in messages:
+            print(message)
+        n_cols += df_other.shape[1]
+        print(f"  Merged. Current shape: ({len(df_cells)}, {n_cols})")
 
-        # Aggregate duplicates
-        if df_other.duplicated(subset=['row', 'col']).any():
-            print(f"  Found duplicate entries for (row, col) in {filename}. Aggregating...")
-            
-            value_cols = [c for c in df_other.columns if c not in ['row', 'col']]
-            
-            # Group by cell and aggregate into lists
-            # This preserves index alignment:
-            # life_species[0] corresponds to life_prey_species[0]
-            df_agg = df_other.groupby(['row', 'col'])[value_cols].agg(list).reset_index()
-            
-            # Cleanup completely empty prey lists for life.csv
-            if filename == 'life.csv':
-                prey_col = f"{prefix}_prey_species"
-                if prey_col in df_agg.columns:
-                    def clean_prey(lst):
-                        # If list contains only empty strings (no prey for any species in cell), return None (BLANK)
-                        if isinstance(lst, list) and all(x == '' for x in lst):
-                            return None
-                        return lst
-                    df_agg[prey_col] = df_agg[prey_col].apply(clean_prey)
-
-            df_other = df_agg
-            print(f"  Aggregated shape: {df_other.shape}")
-
-        # Merge
-        df_cells = pd.merge(df_cells, df_other, on=['row', 'col'], how='left')
-        print(f"  Merged. Current shape: {df_cells.shape}")
+    if results:
+        aggregated = [df_other for df_other, _ in results]
+        df_cells = df_cells.set_index(['row', 'col']).join(aggregated, how='left').reset_index()
 
     # Food web processing
     food_web_path = os.path.join(base_dir, 'food_web.csv')
     if os.path.exists(food_web_path):
         print("Processing food_web.csv...")
         try:
-            df_food = pd.read_csv(food_web_path)
+            # Species and biome names repeat heavily, so group on category codes
+            df_food = categorize_strings(pd.read_csv(food_web_path, engine='pyarrow'))
             group_col = 'biome_overlap'
             
             if group_col in df_food.columns:
-                df_food_agg = df_food.groupby(group_col).agg({
-                    'predator': list,
-                    'prey': list,
-                    'interaction_strength': list
-                }).reset_index()
+                df_food_agg = aggregate_lists(df_food, [group_col], ['predator', 'prey', 'interaction_strength'])
                 
                 df_food_agg.rename(columns={
                     'predator': 'biome_predators',
@@ -104,7 +188,17 @@ def main():
             print(f"Error processing food_web: {e}")
 
     print(f"Saving merged data to {merged_path}...")
-    df_cells.to_csv(merged_path, index=False)
+    # Write list columns as JSON so readers can parse them with orjson
+    # instead of ast.literal_eval
+    df_csv = df_cells.copy()
+    for col in df_csv.columns:
+        if is_list_column(df_csv[col]):
+            df_csv[col] = df_csv[col].map(
+                lambda v: orjson.dumps(v, option=orjson.OPT_SERIALIZE_NUMPY).decode() if isinstance(v, list) else v
+            )
+    df_csv.to_csv(merged_path, index=False)
+
+    write_arrow_copies(df_cells, parquet_path, feather_path)
     print("Done.")
 
 if __name__ == "__main__":
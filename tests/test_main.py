@@ -0,0 +1,37 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+    monkeypatch.setattr(main.optimizer, 'load_data', lambda: calls.append('optimizer'))
+    monkeypatch.setattr(main.tools, 'reload_data', lambda: calls.append('tools'))
+    client = TestClient(main.app)
+    client.calls = calls
+    return client
+
+
+def test_reload_disabled_without_token(client, monkeypatch):
+    monkeypatch.setattr(main, 'RELOAD_TOKEN', None)
+    response = client.post('/api/reload', headers={'X-Reload-Token': ''})
+    assert response.status_code == 403
+    assert client.calls == []
+
+
+@pytest.mark.parametrize('token', [b'wrong', b'', 'é'.encode('latin-1')])
+def test_reload_rejects_bad_token(client, monkeypatch, token):
+    monkeypatch.setattr(main, 'RELOAD_TOKEN', 'secret')
+    response = client.post('/api/reload', headers={'X-Reload-Token': token})
+    assert response.status_code == 403
+    assert client.calls == []
+
+
+def test_reload_with_token(client, monkeypatch):
+    monkeypatch.setattr(main, 'RELOAD_TOKEN', 'secret')
+    response = client.post('/api/reload', headers={'X-Reload-Token': 'secret'})
+    assert response.status_code == 200
+    assert response.json() == {'status': 'ok'}
+    assert client.calls == ['optimizer', 'tools']
@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import merge_abyssal_data
+
+
+def _normalize(value):
+    """Makes NaN compare equal to NaN inside lists."""
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _records(df):
+    return [[_normalize(v) for v in row] for row in df.astype(object).itertuples(index=False, name=None)]
+
+
+def _expected(df, keys, value_cols):
+    return df.groupby(keys, observed=True)[value_cols].agg(list).reset_index()
+
+
+@pytest.mark.parametrize('categorical_keys', [False, True])
+def test_aggregate_lists_matches_groupby_agg_list(categorical_keys):
+    df = pd.DataFrame({
+        'row': [1, 0, 1, 0, np.nan, 2, 0],
+        'col': [0, 1, 0, 1, 3, 2, 0],
+        'value': [10.0, 20.0, np.nan, 40.0, 50.0, 60.0, 70.0],
+        'label': ['a', 'b', 'c', None, 'e', 'f', 'g'],
+    })
+    if categorical_keys:
+        df['col'] = df['col'].astype('category')
+    value_cols = ['value', 'label']
+
+    result = merge_abyssal_data.aggregate_lists(df, ['row', 'col'], value_cols)
+
+    assert list(result.columns) == ['row', 'col', 'value', 'label']
+    assert _records(result) == _records(_expected(df, ['row', 'col'], value_cols))
+
+
+def test_aggregate_lists_keeps_row_order_within_groups():
+    df = pd.DataFrame({
+        'biome': pd.Categorical(['slope', 'trench', 'slope', 'slope', 'trench']),
+        'predator': ['c', 'x', 'a', 'b', 'y'],
+        'strength': [0.3, 0.9, 0.1, 0.2, 0.8],
+    })
+
+    result = merge_abyssal_data.aggregate_lists(df, ['biome'], ['predator', 'strength'])
+
+    assert result['biome'].tolist() == ['slope', 'trench']
+    assert result['predator'].tolist() == [['c', 'a', 'b'], ['x', 'y']]
+    assert result['strength'].tolist() == [[0.3, 0.1, 0.2], [0.9, 0.8]]
+
+
+def test_load_aux_csv_prefixes_and_aggregates(tmp_path):
+    path = tmp_path / 'life.csv'
+    pd.DataFrame({
+        'row': [0, 0, 1],
+        'col': [0, 0, 1],
+        'species': ['Ray', 'Whale', 'Ray'],
+        'density': [0.5, 0.1, 0.3],
+        'prey_species': [None, 'Ray', None],
+    }).to_csv(path, index=False)
+
+    df, messages = merge_abyssal_data.load_aux_csv(str(path), 'life.csv', 'life')
+
+    assert df.index.names == ['row', 'col']
+    assert list(df.columns) == ['life_species', 'life_density', 'life_prey_species']
+    assert df.loc[(0, 0), 'life_species'] == ['Ray', 'Whale']
+    assert df.loc[(0, 0), 'life_density'] == [0.5, 0.1]
+    assert df.loc[(0, 0), 'life_prey_species'] == ['', 'Ray']
+    # A cell whose species have no prey at all is left blank
+    assert df.loc[(1, 1), 'life_prey_species'] is None
+    assert messages[0] == 'Processing life.csv...'
+    assert any('Aggregating' in m for m in messages)
+
+
+def test_load_aux_csv_without_duplicates_keeps_scalars(tmp_path):
+    path = tmp_path / 'corals.csv'
+    pd.DataFrame({'row': [0, 1], 'col': [0, 1], 'health_index': [0.9, 0.4]}).to_csv(path, index=False)
+
+    df, messages = merge_abyssal_data.load_aux_csv(str(path), 'corals.csv', 'coral')
+
+    assert df['coral_health_index'].tolist() == [0.9, 0.4]
+    assert messages == ['Processing corals.csv...']
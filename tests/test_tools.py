@@ -0,0 +1,80 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+import merge_abyssal_data
+from app import tools
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+SNIPPETS = [
+    "result = df['resource_economic_value'].apply(lambda x: sum(x) if isinstance(x, list) else 0).sum()",
+    "result = df['resource_economic_value'].apply(lambda x: sum(x) if x else 0).sum()",
+    "result = int(df['life_species'].apply(len).sum())",
+    "result = sorted(df.nlargest(5, 'resource_economic_value_sum')[['row', 'col']].itertuples(index=False, name=None))",
+    # Scalar columns with missing values must use the same NaN semantics everywhere
+    "result = df[~(df['coral_health_index'] > 0.5)].shape",
+    "result = df[df['coral_health_index'] != df['coral_health_index']].shape",
+    "result = len([r for r, v in zip(df['row'], df['coral_health_index']) if v > 0.9])",
+    "result = repr(df['current_speed_mps'].iloc[0])",
+    # Low-cardinality strings stay plain strings: no zero-count categories
+    "result = df[df['depth_m'] > 6000]['biome'].value_counts().to_dict()",
+    "result = df[df['depth_m'] > 6000].groupby('biome').size().to_dict()",
+]
+
+
+@pytest.fixture(scope='module')
+def frames(tmp_path_factory):
+    """The tools DataFrame as built from merged.csv, merged.parquet and merged.feather."""
+    workdir = tmp_path_factory.mktemp('data')
+    shutil.copy(REPO_ROOT / 'merged.csv', workdir / 'merged.csv')
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.chdir(workdir)
+        built = {'csv': tools.build_data()}
+
+        csv_df, _ = tools.load_dataframe()
+        merge_abyssal_data.write_arrow_copies(csv_df, 'merged.parquet', 'merged.feather')
+        built['feather'] = tools.build_data()
+
+        (workdir / 'merged.feather').unlink()
+        built['parquet'] = tools.build_data()
+    return built
+
+
+def test_same_columns_on_every_load_path(frames):
+    csv_df, csv_source = frames['csv']
+    for name in ('parquet', 'feather'):
+        df, source = frames[name]
+        assert source == csv_source, name
+        assert list(df.columns) == list(csv_df.columns), name
+        assert df.dtypes.to_dict() == csv_df.dtypes.to_dict(), name
+
+
+@pytest.mark.parametrize('code', SNIPPETS)
+def test_agent_snippets_agree_across_load_paths(frames, monkeypatch, code):
+    results = {}
+    for name, (df, _) in frames.items():
+        monkeypatch.setattr(tools, 'DF', df)
+        results[name] = tools.query_data.invoke({'code': code})
+    assert not results['csv'].startswith('ERROR'), results['csv']
+    assert results['parquet'] == results['csv']
+    assert results['feather'] == results['csv']
+
+
+def test_query_data_has_modules_and_builtins():
+    code = (
+        "try:\n"
+        "    int('x')\n"
+        "except ValueError:\n"
+        "    pass\n"
+        "result = (type(df).__name__, hasattr(np, 'nan'), math.floor(2.5), list(reversed([1, 2])))"
+    )
+    assert tools.query_data.invoke({'code': code}) == "('DataFrame', True, 2, [2, 1])"
+
+
+def test_value_counts_has_no_empty_categories(frames):
+    for name, (df, _) in frames.items():
+        counts = df[df['depth_m'] > 6000]['biome'].value_counts()
+        assert (counts > 0).all(), name